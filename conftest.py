@@ -0,0 +1,26 @@
+import os
+import sys
+import pytest
+
+try:
+    from PySide6.QtWidgets import QApplication
+    HAS_QT = True
+except ImportError:
+    HAS_QT = False
+
+def pytest_configure(config):
+    """Register markers so the suite also runs without pytest-xdist"""
+    config.addinivalue_line("markers", "xdist_group(name): run grouped tests on one xdist worker")
+
+@pytest.fixture(scope="session", autouse=True)
+def qt_application():
+    """Create a single QApplication per test process"""
+    if not HAS_QT:
+        yield None
+        return
+    # Headless Linux (e.g. CI) has no display to connect to
+    if sys.platform.startswith("linux") and not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance() or QApplication([])
+    yield app
+    app.quit()
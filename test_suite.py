@@ -16,6 +16,9 @@ Options:
     --verbose       Enable verbose output
     --quick         Run only basic tests
     --log=PATH      Specify log file path (default: ~/Library/Logs/USB Scanner/test_suite.log)
+
+Tests are run through pytest and sharded across CPU cores with pytest-xdist,
+which must be installed.
 """
 
 import argparse
@@ -23,17 +26,15 @@ import os
 import sys
 import time
 import logging
-from logging.handlers import RotatingFileHandler
-import subprocess
-import threading
+from logging.handlers import RotatingFileHandler, MemoryHandler
 import resource
 import unittest
-import shutil
-import glob
+import gc
+import importlib.util
+import tempfile
 import psutil
-import io
-from datetime import datetime
-from pathlib import Path
+import pytest
+from unittest.mock import Mock
 
 # Try to import USB-related modules
 try:
@@ -44,24 +45,78 @@ except ImportError:
     HAS_USB = False
     print("Warning: PyUSB not installed, USB detection tests will be limited")
 
-# Try to import Qt modules for GUI testing
+# Scanner module, loaded once per process by _load_usbfind()
+_USBFIND = None
+
+
+def _load_usbfind():
+    """Load usbfind.py from this directory, caching the module on first use."""
+    global _USBFIND
+    if _USBFIND is None:
+        spec = importlib.util.spec_from_file_location(
+            "usbfind", os.path.join(os.path.dirname(os.path.abspath(__file__)), "usbfind.py")
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules.setdefault("usbfind", module)
+        _USBFIND = module
+    return _USBFIND
+
+
+# Try to load the scanner module
 try:
-    from PySide6.QtWidgets import QApplication
-    from PySide6.QtTest import QTest
-    HAS_QT = True
-except ImportError:
-    HAS_QT = False
-    print("Warning: PySide6 not installed, GUI tests will be limited")
+    _load_usbfind()
+    HAS_SCANNER_MODULE = True
+except (ImportError, OSError):
+    HAS_SCANNER_MODULE = False
+
+# Skip markers are evaluated at collection time, so skipped tests never run
+# setUp/tearDown
+requires_usb = pytest.mark.skipif(not HAS_USB, reason="PyUSB not installed")
+requires_scanner = pytest.mark.skipif(not HAS_SCANNER_MODULE, reason="Scanner module not available")
+
+# Tests that talk to real USB hardware share one xdist worker so they never
+# race on the libusb context / IOKit service
+usb_hardware = pytest.mark.xdist_group("usb_hw")
+
+# Mock devices whose configuration lookup fails, for error handling tests
+PERM_ERR_DEV = Mock()
+DISC_DEV = Mock()
+if HAS_USB:
+    PERM_ERR_DEV.get_active_configuration.side_effect = usb.core.USBError("Permission denied (insufficient permissions)")
+    DISC_DEV.get_active_configuration.side_effect = usb.core.USBError("Device disconnected")
 
 # Default paths
 LOG_DIR = os.path.expanduser("~/Library/Logs/USB Scanner")
 # Declare global before use
 global LOG_FILE
-LOG_FILE = os.path.join(LOG_DIR, "test_suite.log")
-APP_LOG_FILE = os.path.join(LOG_DIR, "usb_scanner.log")
+LOG_FILE = os.environ.get("USB_SCANNER_TEST_LOG", os.path.join(LOG_DIR, "test_suite.log"))
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
 
+def _rss_kb():
+    """Return the current resident set size of this process in KB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * (os.sysconf("SC_PAGESIZE") // 1024)
+    except FileNotFoundError:
+        # No procfs: fall back to peak RSS, which macOS reports in bytes
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss // 1024 if sys.platform == "darwin" else max_rss
+
+
+def _count_fds():
+    """Count the open file descriptors of this process, or None if unsupported."""
+    process = psutil.Process()
+    if hasattr(process, 'num_fds'):
+        return process.num_fds()
+    fd_dir = '/proc/self/fd' if os.path.isdir('/proc/self/fd') else '/dev/fd'
+    if not os.path.isdir(fd_dir):
+        return None
+    with os.scandir(fd_dir) as it:
+        return sum(1 for _ in it)
+
+
 class TestProgress:
     """Track and display test progress."""
     
@@ -106,91 +161,116 @@ class USBScannerTests(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         """Set up the test environment."""
-        # Configure logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(LOG_FILE),
-                logging.StreamHandler(sys.stdout)
-            ]
+        # Ensure application log directory exists before opening the log file
+        os.makedirs(LOG_DIR, exist_ok=True)
+        
+        # Configure logging; file records are buffered and written in batches,
+        # with errors flushed straight away so they are never lost
+        cls._file_handler = logging.FileHandler(LOG_FILE)
+        cls._file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        cls._memory_handler = MemoryHandler(
+            capacity=1024,
+            flushLevel=logging.ERROR,
+            target=cls._file_handler
         )
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        
+        # Handlers go on the suite logger itself: under pytest the root logger
+        # already has handlers, so logging.basicConfig() would do nothing
         cls.logger = logging.getLogger('USBScannerTests')
+        cls.logger.setLevel(logging.DEBUG if os.environ.get("USB_SCANNER_TEST_VERBOSE") else logging.INFO)
+        cls.logger.addHandler(cls._memory_handler)
+        cls.logger.addHandler(stream_handler)
+        cls.logger.propagate = False  # Prevent duplicate logs
         cls.logger.info("Starting USB Scanner test suite")
         
-        # Ensure application log directory exists
-        os.makedirs(LOG_DIR, exist_ok=True)
-        
-        # Try to load the scanner module
-        try:
-            sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-            import usbfind
-            cls.usbfind = usbfind
-            cls.HAS_SCANNER_MODULE = True
-        except ImportError:
-            cls.HAS_SCANNER_MODULE = False
+        cls.usbfind = _load_usbfind() if HAS_SCANNER_MODULE else None
+        if not HAS_SCANNER_MODULE:
             cls.logger.warning("Could not import usbfind module - some tests will be skipped")
         
-        # Initialize Qt Application if PySide6 is available
-        if HAS_QT:
-            cls.app = QApplication.instance() or QApplication([])
+        # Filled in by _get_cached_devices() on first use
+        cls._cached_devices = None
+        
+        # Move everything created so far (modules, Qt, logging) out of the
+        # collector's reach so later collections only scan test objects
+        gc.freeze()
+            
+    @classmethod
+    def _get_cached_devices(cls):
+        """Enumerate USB devices once per process and return the shared list."""
+        # libusb enumeration is slow, so tests that only need to inspect the
+        # attached devices share one scan; errors propagate to the caller
+        if cls._cached_devices is None:
+            cls._cached_devices = list(usb.core.find(find_all=True))
+        return cls._cached_devices
             
     @classmethod
     def tearDownClass(cls):
         """Clean up after all tests."""
         cls.logger.info("Test suite completed")
+        for handler in list(cls.logger.handlers):
+            cls.logger.removeHandler(handler)
+            handler.close()
+        cls._file_handler.close()
+        # Release the frozen setup objects so the final collection sees them
+        gc.unfreeze()
+        gc.collect()
         
     def setUp(self):
         """Set up before each test."""
         self.test_start_time = time.time()
-        self.memory_start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Memory usage is only reported at INFO, so skip sampling it otherwise
+        self.memory_start = None
+        if self.logger.isEnabledFor(logging.INFO):
+            self.memory_start = _rss_kb()
         
     def tearDown(self):
         """Clean up after each test."""
+        if self.memory_start is None:
+            return
+            
         # Check for memory leaks
-        memory_end = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        memory_end = _rss_kb()
         memory_diff = memory_end - self.memory_start
         
         # Log test duration and memory usage
         duration = time.time() - self.test_start_time
-        self.logger.info(f"Test {self._testMethodName} completed in {duration:.2f}s, memory change: {memory_diff} KB")
-        
-        # Force garbage collection to clean up any remaining objects
-        import gc
-        gc.collect()
+        self.logger.info("Test %s completed in %.2fs, memory change: %s KB",
+                         self._testMethodName, duration, memory_diff)
         
+    @requires_usb
+    @usb_hardware
     def test_usb_device_enumeration(self):
         """Test USB device enumeration."""
-        if not HAS_USB:
-            self.skipTest("PyUSB not installed")
-            
         self.logger.info("Testing USB device enumeration")
         
         # List devices without requiring special permissions
-        devices = list(usb.core.find(find_all=True))
-        self.logger.info(f"Found {len(devices)} USB devices without elevated permissions")
+        devices = self._get_cached_devices()
+        self.logger.info("Found %d USB devices without elevated permissions", len(devices))
         
-        # Log device information
-        for i, dev in enumerate(devices):
-            try:
-                vendor = dev.idVendor
-                product = dev.idProduct
-                self.logger.info(f"Device {i+1}: Vendor ID 0x{vendor:04x}, Product ID 0x{product:04x}")
-            except Exception as e:
-                self.logger.warning(f"Could not get device info: {e}")
+        # Log device information as a single record, skipping the formatting
+        # entirely when INFO is filtered out
+        if self.logger.isEnabledFor(logging.INFO):
+            lines = []
+            for i, dev in enumerate(devices):
+                try:
+                    lines.append(f"Device {i+1}: Vendor ID 0x{dev.idVendor:04x}, Product ID 0x{dev.idProduct:04x}")
+                except Exception as e:
+                    lines.append(f"Device {i+1}: Could not get device info: {e}")
+            self.logger.info("Enumerated %d devices:\n%s", len(lines), "\n".join(lines))
                 
         # Ensure at least one device is found (typically built-in USB controller)
         self.assertGreater(len(devices), 0, "No USB devices found")
     
+    @requires_usb
+    @usb_hardware
     def test_usb_permissions(self):
         """Test USB device access with and without permissions."""
-        if not HAS_USB:
-            self.skipTest("PyUSB not installed")
-            
         self.logger.info("Testing USB device permissions")
         
         # Get all devices
-        devices = list(usb.core.find(find_all=True))
+        devices = self._get_cached_devices()
         if not devices:
             self.skipTest("No USB devices found")
             
@@ -217,13 +297,13 @@ class USBScannerTests(unittest.TestCase):
                 self.logger.warning(message)
                 
         # At least log the permission state - don't fail test if permissions aren't available
-        self.logger.info(f"Permission check: {sum(r[0] for r in permission_results)}/{len(permission_results)} devices accessible")
+        self.logger.info("Permission check: %d/%d devices accessible",
+                         sum(r[0] for r in permission_results), len(permission_results))
     
+    @requires_scanner
+    @usb_hardware
     def test_auto_refresh(self):
         """Test auto-refresh functionality."""
-        if not self.HAS_SCANNER_MODULE:
-            self.skipTest("Scanner module not available")
-            
         self.logger.info("Testing auto-refresh functionality")
         
         # Track device counts
@@ -242,40 +322,40 @@ class USBScannerTests(unittest.TestCase):
                     
                 device_counts.append(len(devices))
                 scan_times.append(time.time() - start_time)
-                self.logger.info(f"Scan {i+1}: Found {len(devices)} devices in {scan_times[-1]:.3f}s")
-                time.sleep(1)  # Brief pause between scans
+                self.logger.info("Scan %d: Found %d devices in %.3fs", i + 1, len(devices), scan_times[-1])
             except Exception as e:
-                self.logger.error(f"Error during scan {i+1}: {e}")
+                self.logger.error("Error during scan %d: %s", i + 1, e)
                 self.fail(f"Auto-refresh scan failed: {e}")
                 
         # Check consistency (assuming no devices are added/removed during test)
-        self.assertTrue(all(count == device_counts[0] for count in device_counts), 
-                        "Device count should be consistent across scans")
+        self.assertEqual(len(set(device_counts)), 1,
+                         f"Inconsistent device counts across scans: {device_counts}")
                         
         # Check scan performance
         avg_scan_time = sum(scan_times) / len(scan_times)
-        self.logger.info(f"Average scan time: {avg_scan_time:.3f}s")
+        self.logger.info("Average scan time: %.3fs", avg_scan_time)
         self.assertLess(avg_scan_time, 5.0, "Scans should complete in under 5 seconds")
     
+    @requires_usb
+    @usb_hardware
     def test_memory_leaks(self):
         """Test for memory leaks and resource cleanup."""
-        if not HAS_USB:
-            self.skipTest("PyUSB not installed")
-            
         self.logger.info("Testing for memory leaks in USB device scanning")
         
         # Initialize metrics
-        memory_readings = []
-        file_descriptors_before = len(os.listdir('/dev/fd/')) if os.path.exists('/dev/fd/') else None
+        scan_count = 10
+        file_descriptors_before = _count_fds()
         
-        # Record starting memory
-        initial_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
-        memory_readings.append(initial_memory)
+        # Record starting memory; readings are preallocated so the list never
+        # grows (and reallocates) inside the window being measured
+        initial_memory = _rss_kb()
+        memory_readings = [initial_memory] * (scan_count + 1)
         
         # Run multiple scan operations
-        for i in range(10):
+        for i in range(scan_count):
             try:
-                # Perform a scan
+                # Perform a real scan - enumeration is what is being checked
+                # for leaks here, so the cached device list is not used
                 devices = list(usb.core.find(find_all=True))
                 
                 # Force manual cleanup (Python's garbage collection might delay this)
@@ -284,52 +364,46 @@ class USBScannerTests(unittest.TestCase):
                         try:
                             usb.util.dispose_resources(dev)
                         except Exception as e:
-                            self.logger.debug(f"Error disposing resources: {e}")
+                            self.logger.debug("Error disposing resources: %s", e)
                 
                 # Manually invoke garbage collection
-                import gc
                 gc.collect()
                 
                 # Record memory after scan
-                current_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
-                memory_readings.append(current_memory)
-                self.logger.debug(f"Scan {i+1}: Memory usage {current_memory} KB")
-                
-                time.sleep(0.5)  # Brief pause
+                current_memory = _rss_kb()
+                memory_readings[i + 1] = current_memory
+                self.logger.debug("Scan %d: Memory usage %s KB", i + 1, current_memory)
             except Exception as e:
-                self.logger.error(f"Error during memory leak test scan {i+1}: {e}")
+                self.logger.error("Error during memory leak test scan %d: %s", i + 1, e)
+                memory_readings[i + 1] = memory_readings[i]
         
         # Compare file descriptors before and after
         if file_descriptors_before is not None:
-            file_descriptors_after = len(os.listdir('/dev/fd/'))
-            self.logger.info(f"File descriptors: Before={file_descriptors_before}, After={file_descriptors_after}")
+            file_descriptors_after = _count_fds()
+            self.logger.info("File descriptors: Before=%d, After=%d",
+                             file_descriptors_before, file_descriptors_after)
             fd_diff = file_descriptors_after - file_descriptors_before
             self.assertLess(fd_diff, 5, "File descriptor leak detected")
             
         # Check memory growth
         memory_growth = memory_readings[-1] - memory_readings[0]
-        avg_growth_per_scan = memory_growth / 10 if memory_growth > 0 else 0
-        self.logger.info(f"Memory growth: {memory_growth} KB, Average growth per scan: {avg_growth_per_scan:.2f} KB")
+        avg_growth_per_scan = memory_growth / scan_count if memory_growth > 0 else 0
+        self.logger.info("Memory growth: %s KB, Average growth per scan: %.2f KB",
+                         memory_growth, avg_growth_per_scan)
         
         # Small memory growth is acceptable, but large growth indicates leaks
         self.assertLess(avg_growth_per_scan, 500, 
                         f"Potential memory leak detected: {avg_growth_per_scan:.2f} KB growth per scan")
 
+    @requires_scanner
+    @usb_hardware
     def test_error_handling(self):
         """Test error handling and recovery."""
-        if not self.HAS_SCANNER_MODULE:
-            self.skipTest("Scanner module not available")
-            
         self.logger.info("Testing error handling and recovery")
         
         # Test case 1: Simulate permission error
         try:
-            # Create a device class that raises a permission error
-            class MockDevice:
-                def get_active_configuration(self):
-                    raise usb.core.USBError("Permission denied (insufficient permissions)")
-                    
-            mock_devices = [MockDevice()]
+            mock_devices = [PERM_ERR_DEV]
             
             # Test the error handling in the module
             if hasattr(self.usbfind, 'process_device'):
@@ -343,16 +417,11 @@ class USBScannerTests(unittest.TestCase):
                 self.logger.warning("Can't test process_device function - not exposed in module")
                 
         except Exception as e:
-            self.logger.error(f"Error in permission test: {e}")
+            self.logger.error("Error in permission test: %s", e)
             
         # Test case 2: Simulate device disconnect during scan
         try:
-            # Create a device class that raises a device disconnected error
-            class DisconnectedDevice:
-                def get_active_configuration(self):
-                    raise usb.core.USBError("Device disconnected")
-                
-            mock_devices = [DisconnectedDevice()]
+            mock_devices = [DISC_DEV]
             
             # Test if scanner can recover from disconnected device
             if hasattr(self.usbfind, 'process_device'):
@@ -366,61 +435,59 @@ class USBScannerTests(unittest.TestCase):
                 self.logger.warning("Can't test process_device function - not exposed in module")
                 
         except Exception as e:
-            self.logger.error(f"Error in disconnection test: {e}")
+            self.logger.error("Error in disconnection test: %s", e)
             
         # Verify the application can recover from errors
         try:
             # Run a normal scan after simulating errors
             if HAS_USB:
                 devices = list(usb.core.find(find_all=True))
-                self.logger.info(f"Recovery scan found {len(devices)} devices")
+                self.logger.info("Recovery scan found %d devices", len(devices))
                 self.assertTrue(True, "Application recovered successfully")
         except Exception as e:
-            self.logger.error(f"Recovery failed: {e}")
+            self.logger.error("Recovery failed: %s", e)
             self.fail(f"Failed to recover from errors: {e}")
     
     def test_log_rotation(self):
         """Test log rotation and management."""
         self.logger.info("Testing log rotation")
         
-        # Get initial log file size
-        if not os.path.exists(APP_LOG_FILE):
-            self.skipTest("Application log file does not exist")
+        # Rotate a scratch copy of the log in a temporary directory so the
+        # real application logs are left alone and the test stays hermetic
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = os.path.join(tmp, "usb_scanner.log")
             
-        initial_size = os.path.getsize(APP_LOG_FILE)
-        self.logger.info(f"Initial log size: {initial_size} bytes")
-        
-        # Generate log entries to test rotation with smaller maxBytes
-        test_logger = logging.getLogger('test_rotation')
-        file_handler = RotatingFileHandler(
-            APP_LOG_FILE,
-            maxBytes=1024,  # 1 KB - smaller size to trigger rotation
-            backupCount=5
-        )
-        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-        test_logger.addHandler(file_handler)
-        
-        # Generate enough entries to trigger rotation
-        long_message = "X" * 100  # Create a longer message to fill up space faster
-        for i in range(50):  # Reduced number of iterations but with longer messages
-            test_logger.info(f"Test log entry {i}: {long_message}")
+            test_logger = logging.getLogger('test_rotation')
+            test_logger.setLevel(logging.INFO)
+            test_logger.propagate = False
+            file_handler = RotatingFileHandler(
+                log_path,
+                maxBytes=1024,  # 1 KB - smaller size to trigger rotation
+                backupCount=5,
+                delay=True
+            )
+            file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            test_logger.addHandler(file_handler)
             
-        # Close the file handler to ensure all logs are written
-        file_handler.close()
-        test_logger.removeHandler(file_handler)
+            # Force a rollover directly rather than writing entries until maxBytes
+            # is hit, then confirm the fresh log file is still writable
+            test_logger.info("pre-rotation")
+            file_handler.doRollover()
+            test_logger.info("post-rotation")
+                
+            # Close the file handler to ensure all logs are written
+            file_handler.close()
+            test_logger.removeHandler(file_handler)
+                
+            # Check if log was rotated
+            prefix = os.path.basename(log_path) + "."
+            with os.scandir(tmp) as it:
+                rotated_logs = [entry.path for entry in it if entry.name.startswith(prefix)]
+            self.logger.info("Found %d rotated log files", len(rotated_logs))
             
-        # Check if log was rotated
-        rotated_logs = glob.glob(f"{APP_LOG_FILE}.*")
-        self.logger.info(f"Found {len(rotated_logs)} rotated log files")
-        
-        # Verify log rotation occurred
-        self.assertGreater(len(rotated_logs), 0, "Log rotation did not occur")
-        
-        # Clean up test logs
-        for log in rotated_logs:
-            if '.test.' in log:
-                os.remove(log)
-
+            # Verify log rotation occurred
+            self.assertGreater(len(rotated_logs), 0, "Log rotation did not occur")
+            self.assertTrue(os.path.exists(log_path), "Log file was not recreated after rotation")
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='USB Scanner Test Suite')
@@ -429,22 +496,23 @@ if __name__ == '__main__':
     parser.add_argument('--log', help='Specify log file path')
     args = parser.parse_args()
     
+    # Tests are sharded across xdist workers, so options must reach them
+    # through pytest arguments and the environment rather than module globals
+    pytest_args = [
+        "-n", str(max(1, (os.cpu_count() or 2) - 2)),
+        "--dist=loadgroup",
+        __file__,
+    ]
+    
     if args.verbose:
-        logging.getLogger().setLevel(logging.DEBUG)
+        pytest_args.append("-v")
+        os.environ["USB_SCANNER_TEST_VERBOSE"] = "1"
         
     if args.log:
-        LOG_FILE = args.log
+        os.environ["USB_SCANNER_TEST_LOG"] = args.log
         
-    # Run the tests
-    suite = unittest.TestLoader().loadTestsFromTestCase(USBScannerTests)
-    
     if args.quick:
         # Run only basic tests
-        quick_tests = unittest.TestSuite()
-        for test in suite:
-            if not any(x in test._testMethodName for x in ['memory', 'rotation']):
-                quick_tests.addTest(test)
-        suite = quick_tests
+        pytest_args += ["-k", "not memory and not rotation"]
         
-    result = unittest.TextTestRunner(verbosity=2).run(suite)
-    sys.exit(not result.wasSuccessful())
+    sys.exit(pytest.main(pytest_args))
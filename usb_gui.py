@@ -3,18 +3,32 @@ import sys
 import io
 import os
 import time
-import subprocess
-import datetime
 import logging
 import atexit
-from logging.handlers import RotatingFileHandler
-from contextlib import redirect_stdout, contextmanager
+import threading
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler, MemoryHandler
+from contextlib import redirect_stdout
 from pathlib import Path
 
 # Configure logging
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 LOG_MAX_BYTES = 10 * 1024 * 1024  # 10 MB
 LOG_BACKUP_COUNT = 5
+LOG_BUFFER_CAPACITY = 1024  # records held before a forced flush
+LOG_FLUSH_INTERVAL = 30  # seconds between periodic flushes
+
+# Shell command used to reset USB storage on Linux (run under sudo)
+LINUX_USB_RESET_COMMAND = "modprobe -r usb-storage; sleep 1; modprobe usb-storage"
+
+# Write buffer size used when saving the output log
+SAVE_LOG_BUFFER_SIZE = 1 << 20  # 1 MB
+
+# Maximum number of lines kept in the output area; older lines are dropped
+OUTPUT_MAX_BLOCKS = 5000
+
+# Auto-refresh timing
+AUTO_REFRESH_INTERVAL_MS = 5000
 
 # Create log directory if it doesn't exist
 log_dir = Path(os.path.expanduser("~/Library/Logs/USB Scanner"))
@@ -29,30 +43,60 @@ file_handler = RotatingFileHandler(
 )
 file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
 
+# Buffer file records and write them in batches; warnings and errors are
+# flushed immediately so nothing important is held back
+buffered_handler = MemoryHandler(
+    capacity=LOG_BUFFER_CAPACITY,
+    flushLevel=logging.WARNING,
+    target=file_handler,
+    flushOnClose=True
+)
+
 # Create and configure console handler
 console_handler = logging.StreamHandler()
 console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
 
 # Configure logger
 logger = logging.getLogger('USB Scanner')
-logger.setLevel(logging.DEBUG)
-logger.addHandler(file_handler)
+# Debug logging is opt-in via the USB_SCANNER_DEBUG environment variable
+logger.setLevel(logging.DEBUG if os.environ.get("USB_SCANNER_DEBUG") else logging.INFO)
+logger.addHandler(buffered_handler)
 logger.addHandler(console_handler)
 logger.propagate = False  # Prevent duplicate logs
 
+_log_flush_timer = None
+
+def _schedule_log_flush():
+    """Flush buffered log records every LOG_FLUSH_INTERVAL seconds"""
+    global _log_flush_timer
+    _log_flush_timer = threading.Timer(LOG_FLUSH_INTERVAL, _periodic_log_flush)
+    _log_flush_timer.daemon = True
+    _log_flush_timer.start()
+
+def _periodic_log_flush():
+    buffered_handler.flush()
+    _schedule_log_flush()
+
+_schedule_log_flush()
+
 logger.info("USB Scanner logging initialized")
 
 def cleanup():
     """Clean up resources on application exit"""
     logger.info("Application shutting down...")
+    # Log before the handlers are flushed and closed, or the record is lost
+    logger.info("Cleanup completed")
     try:
         # Deliberately avoid accessing USB devices during shutdown
         # Just ensure all file handles and resources are closed
+        if _log_flush_timer:
+            _log_flush_timer.cancel()
+        buffered_handler.flush()
         for handler in logger.handlers:
             handler.close()
+        file_handler.close()
     except Exception as e:
         print(f"Cleanup warning: {e}")
-    logger.info("Cleanup completed")
 
 # Register cleanup handler
 atexit.register(cleanup)
@@ -60,12 +104,12 @@ atexit.register(cleanup)
 # Import Qt modules with error handling
 try:
     from PySide6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, 
-                                QHBoxLayout, QPushButton, QTextEdit, 
+                                QHBoxLayout, QPushButton, QPlainTextEdit, 
                                 QWidget, QLabel, QMessageBox, QProgressBar,
-                                QStatusBar, QMenu, QMenuBar,
+                                QStatusBar,
                                 QFileDialog, QCheckBox)
-    from PySide6.QtCore import Qt, QObject, Signal, Slot, QThread, QTimer
-    from PySide6.QtGui import QIcon, QAction
+    from PySide6.QtCore import Qt, QObject, Signal, Slot, QThread, QTimer, QProcess
+    from PySide6.QtGui import QIcon, QAction, QTextCursor
     logger.info("Successfully imported PySide6 modules")
 except ImportError as e:
     logger.error(f"Failed to import PySide6 modules: {e}")
@@ -83,16 +127,65 @@ except ImportError as e:
     print(f"Error: Failed to import required USB modules: {e}")
     sys.exit(1)
 
+# Window icon, resolved once at import and loaded on first use
+_ICON_PATH = Path(__file__).resolve().parent / "Images" / "usb_icon.png"
+
+
+@lru_cache(maxsize=None)
+def get_app_icon():
+    """Return the application icon, or None if the icon file is missing"""
+    # Cached either way, so a missing file is only checked for once
+    return QIcon(str(_ICON_PATH)) if _ICON_PATH.exists() else None
+
+
+# Rich text shown by the Help menu dialogs
+_ABOUT_HTML = (
+    "<h2>USB Device Security Scanner</h2>"
+    "<p>Version 1.0</p>"
+    "<p>A tool for scanning, analyzing, and monitoring USB devices.</p>"
+    "<p>Based on the USB Hacking toolkit by Merimetso-Code.</p>"
+    "<p><a href='https://github.com/Merimetso-Code/USB-Hacking'>GitHub Repository</a></p>"
+    "<p>© 2023 Merimetso Ltd.</p>"
+)
+
+_DOC_HTML = (
+    "<h2>USB Device Security Documentation</h2>"
+    "<h3>USB Security Concepts</h3>"
+    "<ul>"
+    "<li><b>Vendor ID (VID)</b>: Unique identifier assigned to USB device manufacturers</li>"
+    "<li><b>Product ID (PID)</b>: Identifies a specific product from a manufacturer</li>"
+    "<li><b>Device Class</b>: Defines the type of device (HID, Mass Storage, etc.)</li>"
+    "<li><b>Endpoint</b>: Communication channels within a USB device</li>"
+    "</ul>"
+    "<h3>Common Security Issues</h3>"
+    "<ul>"
+    "<li>Bad USB attacks - devices that masquerade as keyboards</li>"
+    "<li>Data exfiltration via USB storage</li>"
+    "<li>Hardware keyloggers</li>"
+    "<li>USB device fingerprinting and tracking</li>"
+    "</ul>"
+    "<h3>Using This Tool</h3>"
+    "<ul>"
+    "<li>Regular scanning helps identify unexpected USB devices</li>"
+    "<li>Verbose mode provides detailed information for security analysis</li>"
+    "<li>Save logs to track USB device history</li>"
+    "<li>Auto-refresh to monitor for new device connections</li>"
+    "</ul>"
+    "<p>For more information, visit: "
+    "<a href='https://github.com/Merimetso-Code/USB-Hacking'>USB Hacking Repository</a></p>"
+)
+
+
 class USBScanError(Exception):
     """Custom exception for USB scanning errors"""
     pass
 
 
-def log_exception(e, message="An error occurred"):
+def log_exception(e, message="An error occurred", with_traceback=False):
     """Helper function to log exceptions with consistent formatting"""
     error_type = type(e).__name__
     error_msg = str(e)
-    logger.error(f"{message}: {error_type} - {error_msg}", exc_info=True)
+    logger.error(f"{message}: {error_type} - {error_msg}", exc_info=with_traceback)
     return f"{message}: {error_type} - {error_msg}"
 class OutputRedirector(io.StringIO):
     """Redirects stdout to capture printed output"""
@@ -101,70 +194,70 @@ class OutputRedirector(io.StringIO):
         self.text_widget = text_widget
         self.old_stdout = sys.stdout
 
-    def write(self, text):
-        super(OutputRedirector, self).write(text)
-        self.text_widget.append(text)
-        # Ensure text is visible by scrolling to the bottom
-        self.text_widget.verticalScrollBar().setValue(
-            self.text_widget.verticalScrollBar().maximum()
-        )
-
-class ScanThread(QThread):
-    """Thread for running USB scans in the background"""
+class ScanWorker(QObject):
+    """Runs USB scans on a persistent background thread"""
     progress_signal = Signal(int)
-    finished_signal = Signal()
+    finished_signal = Signal(str, int)
     error_signal = Signal(str)
     
-    def __init__(self, verbose=False, parent=None):
-        super(ScanThread, self).__init__(parent)
-        self.verbose = verbose
-        self.output_buffer = io.StringIO()
-        logger.debug(f"Scan thread initialized with verbose={self.verbose}")
+    def __init__(self, parent=None):
+        super(ScanWorker, self).__init__(parent)
+        self.verbose = False
         
-    def run(self):
-        logger.info(f"Starting USB scan thread (verbose={self.verbose})")
+    @Slot(bool, str)
+    def scan(self, verbose, banner=""):
+        self.verbose = verbose
+        output_buffer = io.StringIO()
+        output_buffer.write(banner)
         try:
             # Redirect stdout to our buffer
-            with redirect_stdout(self.output_buffer):
+            with redirect_stdout(output_buffer):
                 # Reset usbfind global variables
                 usbfind.Verbose = self.verbose
                 usbfind.Busses = 'NONE'
                 usbfind.BackEnd = 'NONE'
                 
                 logger.debug("Scanning USB devices...")
-                # Simulate progress (since we can't easily track real progress)
-                for i in range(101):
-                    if i < 100:  # Only update progress if not finished
-                        self.progress_signal.emit(i)
-                        time.sleep(0.01)  # Small delay to simulate work
-                    
-                    # Run main function at 100%
-                    if i == 100:
-                        logger.debug("Executing usbfind.main()")
-                        usbfind.main()
+                # usbfind gives no progress feedback, so only report start and
+                # completion; the GUI shows a busy indicator in between
+                self.progress_signal.emit(0)
+                logger.debug("Executing usbfind.main()")
+                usbfind.main()
                         
+            # Count devices from this scan's output only; usbfind prints one
+            # padded "Bus Location    :" line per device, or in verbose mode
+            # one pyusb descriptor dump headed "DEVICE ID vvvv:pppp on Bus ..."
+            output = output_buffer.getvalue()
+            device_count = output.count("DEVICE ID " if self.verbose else "Bus Location")
+            
             # Signal completion
             self.progress_signal.emit(100)
             logger.info("USB scan completed successfully")
-            self.finished_signal.emit()
+            self.finished_signal.emit(output, device_count)
             
         except Exception as e:
-            error_message = log_exception(e, "Error during USB scan")
+            error_message = log_exception(e, "Error during USB scan", with_traceback=True)
             logger.error(f"Scan failed: {str(e)}")
             self.error_signal.emit(error_message)
+
+
 class USBGui(QMainWindow):
+    # Queued across threads to ScanWorker.scan
+    scan_requested = Signal(bool, str)
+    
     def __init__(self):
         super(USBGui, self).__init__()
         
         self.setWindowTitle("USB Device Security Scanner")
         self.resize(800, 600)
         # Set window icon if icon file exists
-        icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Images/usb_icon.png")
-        if os.path.exists(icon_path):
-            self.setWindowIcon(QIcon(icon_path))
+        app_icon = get_app_icon()
+        if app_icon is not None:
+            self.setWindowIcon(app_icon)
         
         # Initialize member variables
-        self.scan_thread = None
+        self.scan_in_progress = False
+        self.usb_reset_process = None
         self.auto_refresh_timer = None
         self.auto_refresh_active = False
         self.device_count = 0
@@ -221,10 +314,48 @@ class USBGui(QMainWindow):
         main_layout.addWidget(self.progress_bar)
         
         # Output text area
-        self.output_text = QTextEdit()
+        self.output_text = QPlainTextEdit()
         self.output_text.setReadOnly(True)
+        self.output_text.setMaximumBlockCount(OUTPUT_MAX_BLOCKS)
         main_layout.addWidget(self.output_text)
         
+        # Background scan worker, reused for every scan
+        self.worker_thread = QThread(self)
+        self.worker = ScanWorker()
+        self.worker.moveToThread(self.worker_thread)
+        self.worker.progress_signal.connect(self.update_progress)
+        self.worker.finished_signal.connect(self.scan_finished)
+        self.worker.error_signal.connect(self.handle_error)
+        self.worker_thread.finished.connect(self.worker.deleteLater)
+        self.scan_requested.connect(self.worker.scan)
+        self.worker_thread.start()
+        # The thread must be stopped before it is destroyed, even if the
+        # window is deleted or the application quits without closing it
+        QApplication.instance().aboutToQuit.connect(self._stop_worker)
+        self.destroyed.connect(lambda: self._stop_worker())
+        
+    def closeEvent(self, event):
+        """Stop the auto-refresh timer and scan worker when the window closes"""
+        if self.auto_refresh_timer:
+            self.auto_refresh_timer.stop()
+        self._stop_worker()
+        super(USBGui, self).closeEvent(event)
+        
+    def _stop_worker(self):
+        """Stop the scan worker thread if it is still running"""
+        if self.worker_thread.isRunning():
+            # Detach the worker first so a scan finishing during shutdown
+            # cannot deliver signals into a window that is going away
+            for signal in (self.worker.progress_signal,
+                           self.worker.finished_signal,
+                           self.worker.error_signal):
+                try:
+                    signal.disconnect()
+                except (TypeError, RuntimeError):
+                    pass
+            self.worker_thread.quit()
+            self.worker_thread.wait()
+        
     def create_menu_bar(self):
         """Create the menu bar with its menus and actions"""
         menubar = self.menuBar()
@@ -277,22 +408,31 @@ class USBGui(QMainWindow):
         """Update the progress bar during a scan operation"""
         self.progress_bar.setValue(value)
         
-    def scan_finished(self):
+    def scan_finished(self, output_text, device_count):
         """Handle scan completion"""
+        self.scan_in_progress = False
         try:
-            # Hide progress bar
+            # Hide progress bar and restore its normal range
             self.progress_bar.setVisible(False)
+            self.progress_bar.setRange(0, 100)
             
             # Re-enable buttons
             self.set_buttons_enabled(True)
             
-            # Get the text from the scan thread and update the output
-            if self.scan_thread and hasattr(self.scan_thread, 'output_buffer'):
-                output_text = self.scan_thread.output_buffer.getvalue()
-                self.output_text.append(output_text)
+            # Add the scan output in a single insert so the document is only
+            # laid out once
+            self.output_text.setUpdatesEnabled(False)
+            try:
+                self.output_text.moveCursor(QTextCursor.End)
+                self.output_text.insertPlainText(output_text)
+            finally:
+                self.output_text.setUpdatesEnabled(True)
+            
+            # The insert leaves the cursor at the end; scroll to it once
+            self.output_text.ensureCursorVisible()
             
             # Update device count
-            self.update_device_count()
+            self.device_count = device_count
             
             # Update status
             status_msg = f"Scan complete. Found {self.device_count} USB device(s)."
@@ -301,34 +441,18 @@ class USBGui(QMainWindow):
         except Exception as e:
             error_msg = log_exception(e, "Error processing scan results")
             self.statusBar.showMessage(f"Error: {error_msg}")
-            self.output_text.append(f"\nError processing results: {error_msg}\n")
+            self.output_text.appendPlainText(f"\nError processing results: {error_msg}\n")
     
-    def update_device_count(self):
-        """Update the count of USB devices found"""
-        # Count the devices by parsing the output text
-        output = self.output_text.toPlainText()
-        
-        # Simple way to count USB devices (may need adjustment based on output format)
-        if "No devices found" in output:
-            self.device_count = 0
-        else:
-            # Count based on typical output patterns from usbfind.py
-            # This is a simplistic approach and may need refinement
-            lines = output.split('\n')
-            device_lines = [line for line in lines if "Bus Location:" in line]
-            self.device_count = len(device_lines)
-        
-        # Update status bar
-        self.statusBar.showMessage(f"Found {self.device_count} USB device(s)")
-        
     def handle_error(self, error_msg):
         """Handle errors that occur during scanning"""
+        self.scan_in_progress = False
         try:
             logger.error(f"Error handler called: {error_msg}")
             self.progress_bar.setVisible(False)
+            self.progress_bar.setRange(0, 100)
             self.set_buttons_enabled(True)
             
-            self.output_text.append(f"\nERROR: {error_msg}\n")
+            self.output_text.appendPlainText(f"\nERROR: {error_msg}\n")
             self.statusBar.showMessage(f"Error: {error_msg}")
             
             # Show error dialog for critical errors
@@ -344,55 +468,38 @@ class USBGui(QMainWindow):
             print(f"Critical error in error handler: {e}")
             self.statusBar.showMessage("A critical error occurred")
         
-    def scan_normal(self):
-        """Run USB scan in normal mode using a separate thread"""
+    def _start_scan(self, verbose, banner=""):
+        """Run a USB scan on the background worker, prepending banner to its output"""
+        if self.scan_in_progress:
+            self.statusBar.showMessage("A scan is already in progress")
+            return
+        mode = "verbose" if verbose else "normal"
         try:
-            logger.info("Starting USB scan in normal mode")
+            logger.info("Starting USB scan (verbose=%s)", verbose)
             self.output_text.clear()
-            self.output_text.append("Starting USB scan in normal mode...\n")
+            self.output_text.appendPlainText(f"Starting USB scan in {mode} mode...\n")
             
             # Disable buttons during scan
             self.set_buttons_enabled(False)
             
-            # Show and reset progress bar
-            self.progress_bar.setValue(0)
+            # Show progress bar as a busy indicator while the scan runs
+            self.progress_bar.setRange(0, 0)
             self.progress_bar.setVisible(True)
             
-            # Create and start scan thread
-            self.scan_thread = ScanThread(verbose=False, parent=self)
-            self.scan_thread.progress_signal.connect(self.update_progress)
-            self.scan_thread.finished_signal.connect(self.scan_finished)
-            self.scan_thread.error_signal.connect(self.handle_error)
-            self.scan_thread.start()
-            logger.debug("Scan thread started")
+            # Hand the scan to the background worker
+            self.scan_in_progress = True
+            self.scan_requested.emit(verbose, banner)
         except Exception as e:
-            error_msg = log_exception(e, "Failed to start normal scan")
+            error_msg = log_exception(e, f"Failed to start {mode} scan")
             self.handle_error(error_msg)
+    
+    def scan_normal(self):
+        """Run USB scan in normal mode using a separate thread"""
+        self._start_scan(False)
         
     def scan_verbose(self):
         """Run USB scan in verbose mode using a separate thread"""
-        try:
-            logger.info("Starting USB scan in verbose mode")
-            self.output_text.clear()
-            self.output_text.append("Starting USB scan in verbose mode...\n")
-            
-            # Disable buttons during scan
-            self.set_buttons_enabled(False)
-            
-            # Show and reset progress bar
-            self.progress_bar.setValue(0)
-            self.progress_bar.setVisible(True)
-            
-            # Create and start scan thread
-            self.scan_thread = ScanThread(verbose=True, parent=self)
-            self.scan_thread.progress_signal.connect(self.update_progress)
-            self.scan_thread.finished_signal.connect(self.scan_finished)
-            self.scan_thread.error_signal.connect(self.handle_error)
-            self.scan_thread.start()
-            logger.debug("Verbose scan thread started")
-        except Exception as e:
-            error_msg = log_exception(e, "Failed to start verbose scan")
-            self.handle_error(error_msg)
+        self._start_scan(True)
         
     def clear_output(self):
         """Clear the output text area"""
@@ -403,7 +510,7 @@ class USBGui(QMainWindow):
         """Save the current log to a file"""
         try:
             # Get current timestamp for default filename
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
             default_filename = f"usb_scan_{timestamp}.txt"
             
             # Open file dialog
@@ -415,9 +522,15 @@ class USBGui(QMainWindow):
             )
             
             if file_path:
-                # Save the text content to the selected file
-                with open(file_path, 'w') as f:
-                    f.write(self.output_text.toPlainText())
+                # Stream the document to the file block by block instead of
+                # materializing the whole text as one string first
+                with open(file_path, 'w', buffering=SAVE_LOG_BUFFER_SIZE, encoding='utf-8') as f:
+                    block = self.output_text.document().begin()
+                    while block.isValid():
+                        f.write(block.text())
+                        block = block.next()
+                        if block.isValid():
+                            f.write('\n')
                 
                 self.statusBar.showMessage(f"Log saved to {file_path}")
                 return True
@@ -449,91 +562,86 @@ class USBGui(QMainWindow):
             
             # Platform specific USB reset commands
             if sys.platform.startswith('linux'):
-                # For Linux, we can reset USB using various commands
-                command = ['sudo', 'modprobe', '-r', 'usb-storage']
-                result = subprocess.run(command, capture_output=True, text=True)
-                time.sleep(1)
-                command = ['sudo', 'modprobe', 'usb-storage']
-                result = subprocess.run(command, capture_output=True, text=True)
-                
-                if result.returncode != 0:
-                    raise Exception(f"Command failed: {result.stderr}")
+                # For Linux, reload the usb-storage module. This runs as one
+                # non-blocking shell invocation so the GUI stays responsive
+                if self.usb_reset_process is not None:
+                    self.statusBar.showMessage("USB reset already in progress")
+                    return
+                self.usb_reset_process = QProcess(self)
+                self.usb_reset_process.finished.connect(self.usb_reset_finished)
+                self.usb_reset_process.errorOccurred.connect(self.usb_reset_error)
+                self.usb_reset_process.start('sudo', ['sh', '-c', LINUX_USB_RESET_COMMAND])
+                self.statusBar.showMessage("Resetting USB subsystem...")
+                return
                     
             elif sys.platform == 'darwin':  # macOS
                 # macOS doesn't have a simple command line tool for USB reset
                 # We'll need to use IOKit via Python bindings or a helper tool
-                self.output_text.append("USB reset on macOS requires system-level access.\n")
-                self.output_text.append("Try disconnecting and reconnecting USB devices manually.\n")
+                self.output_text.appendPlainText("USB reset on macOS requires system-level access.\n")
+                self.output_text.appendPlainText("Try disconnecting and reconnecting USB devices manually.\n")
                 self.statusBar.showMessage("USB reset not fully supported on macOS")
                 return
                 
             elif sys.platform.startswith('win'):  # Windows
                 # For Windows, use devcon or similar
-                self.output_text.append("USB reset on Windows requires system-level access.\n")
-                self.output_text.append("Try using Device Manager to disable/enable USB controllers.\n")
+                self.output_text.appendPlainText("USB reset on Windows requires system-level access.\n")
+                self.output_text.appendPlainText("Try using Device Manager to disable/enable USB controllers.\n")
                 self.statusBar.showMessage("USB reset not fully supported on Windows")
                 return
             
-            self.output_text.append("USB subsystem reset attempted.\n")
-            self.output_text.append("You may need to reconnect USB devices.\n")
-            self.statusBar.showMessage("USB reset completed")
-            
-            # Scan again after a brief delay
-            QTimer.singleShot(2000, self.scan_normal)
+            self.usb_reset_completed()
             
         except Exception as e:
-            error_msg = f"Error resetting USB: {str(e)}"
-            self.output_text.append(f"ERROR: {error_msg}\n")
-            self.statusBar.showMessage(error_msg)
-            QMessageBox.warning(self, "USB Reset Error", error_msg)
+            self.usb_reset_failed(str(e))
+
+    def usb_reset_finished(self, exit_code, exit_status):
+        """Handle completion of the USB reset command"""
+        process = self.usb_reset_process
+        self.usb_reset_process = None
+        if exit_status != QProcess.NormalExit or exit_code != 0:
+            stderr = bytes(process.readAllStandardError()).decode(errors='replace')
+            self.usb_reset_failed(f"Command failed: {stderr}")
+        else:
+            self.usb_reset_completed()
+        process.deleteLater()
+
+    def usb_reset_error(self, error):
+        """Handle the USB reset command failing to start"""
+        # Other errors (e.g. a crash) are followed by finished and reported there
+        if error != QProcess.FailedToStart:
+            return
+        process = self.usb_reset_process
+        self.usb_reset_process = None
+        self.usb_reset_failed(process.errorString())
+        process.deleteLater()
+
+    def usb_reset_completed(self):
+        """Report a successful USB reset and rescan"""
+        self.output_text.appendPlainText("USB subsystem reset attempted.\n")
+        self.output_text.appendPlainText("You may need to reconnect USB devices.\n")
+        self.statusBar.showMessage("USB reset completed")
+        
+        # Scan again after a brief delay
+        QTimer.singleShot(2000, self.scan_normal)
+
+    def usb_reset_failed(self, reason):
+        """Report a failed USB reset"""
+        error_msg = f"Error resetting USB: {reason}"
+        self.output_text.appendPlainText(f"ERROR: {error_msg}\n")
+        self.statusBar.showMessage(error_msg)
+        QMessageBox.warning(self, "USB Reset Error", error_msg)
 
     def show_about_dialog(self):
         """Display information about the application"""
-        about_text = (
-            "<h2>USB Device Security Scanner</h2>"
-            "<p>Version 1.0</p>"
-            "<p>A tool for scanning, analyzing, and monitoring USB devices.</p>"
-            "<p>Based on the USB Hacking toolkit by Merimetso-Code.</p>"
-            "<p><a href='https://github.com/Merimetso-Code/USB-Hacking'>GitHub Repository</a></p>"
-            "<p>© 2023 Merimetso Ltd.</p>"
-        )
-        
-        QMessageBox.about(self, "About USB Scanner", about_text)
+        QMessageBox.about(self, "About USB Scanner", _ABOUT_HTML)
         self.statusBar.showMessage("About dialog displayed")
 
     def show_documentation(self):
         """Show documentation for USB hacking and security"""
-        doc_text = (
-            "<h2>USB Device Security Documentation</h2>"
-            "<h3>USB Security Concepts</h3>"
-            "<ul>"
-            "<li><b>Vendor ID (VID)</b>: Unique identifier assigned to USB device manufacturers</li>"
-            "<li><b>Product ID (PID)</b>: Identifies a specific product from a manufacturer</li>"
-            "<li><b>Device Class</b>: Defines the type of device (HID, Mass Storage, etc.)</li>"
-            "<li><b>Endpoint</b>: Communication channels within a USB device</li>"
-            "</ul>"
-            "<h3>Common Security Issues</h3>"
-            "<ul>"
-            "<li>Bad USB attacks - devices that masquerade as keyboards</li>"
-            "<li>Data exfiltration via USB storage</li>"
-            "<li>Hardware keyloggers</li>"
-            "<li>USB device fingerprinting and tracking</li>"
-            "</ul>"
-            "<h3>Using This Tool</h3>"
-            "<ul>"
-            "<li>Regular scanning helps identify unexpected USB devices</li>"
-            "<li>Verbose mode provides detailed information for security analysis</li>"
-            "<li>Save logs to track USB device history</li>"
-            "<li>Auto-refresh to monitor for new device connections</li>"
-            "</ul>"
-            "<p>For more information, visit: "
-            "<a href='https://github.com/Merimetso-Code/USB-Hacking'>USB Hacking Repository</a></p>"
-        )
-        
         # Create a more sophisticated documentation dialog
         doc_dialog = QMessageBox(self)
         doc_dialog.setWindowTitle("USB Security Documentation")
-        doc_dialog.setText(doc_text)
+        doc_dialog.setText(_DOC_HTML)
         doc_dialog.setTextFormat(Qt.RichText)
         doc_dialog.setIcon(QMessageBox.Information)
         doc_dialog.setStandardButtons(QMessageBox.Ok)
@@ -547,7 +655,7 @@ class USBGui(QMainWindow):
                 # Start auto-refresh if it's not already running
                 if not self.auto_refresh_active:
                     self.auto_refresh_active = True
-                    self.output_text.append("Auto-refresh enabled (5 second intervals)\n")
+                    self.output_text.appendPlainText("Auto-refresh enabled (5 second intervals)\n")
                     self.statusBar.showMessage("Auto-refresh enabled")
                     
                     # Create and start timer if it doesn't exist
@@ -556,7 +664,7 @@ class USBGui(QMainWindow):
                         self.auto_refresh_timer.timeout.connect(self.auto_refresh_scan)
                     
                     # Start the timer with 5 second interval
-                    self.auto_refresh_timer.start(5000)
+                    self.auto_refresh_timer.start(AUTO_REFRESH_INTERVAL_MS)
             else:
                 # Stop auto-refresh
                 if self.auto_refresh_active:
@@ -564,11 +672,11 @@ class USBGui(QMainWindow):
                     if self.auto_refresh_timer:
                         self.auto_refresh_timer.stop()
                     
-                    self.output_text.append("Auto-refresh disabled\n")
+                    self.output_text.appendPlainText("Auto-refresh disabled\n")
                     self.statusBar.showMessage("Auto-refresh disabled")
         except Exception as e:
             error_msg = f"Error toggling auto-refresh: {str(e)}"
-            self.output_text.append(f"ERROR: {error_msg}\n")
+            self.output_text.appendPlainText(f"ERROR: {error_msg}\n")
             self.statusBar.showMessage(error_msg)
             self.auto_refresh_checkbox.setChecked(False)
             self.auto_refresh_active = False
@@ -578,11 +686,12 @@ class USBGui(QMainWindow):
         """Perform a scan when auto-refresh is triggered"""
         try:
             # Only start a new scan if a scan isn't already in progress
-            if not self.scan_thread or not self.scan_thread.isRunning():
-                self.output_text.append("\n--- Auto-refresh scan at " + 
-                                      datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S") + " ---\n")
+            if not self.scan_in_progress:
+                # The banner travels with the scan output so it lands in the
+                # same single widget update
+                banner = time.strftime("\n--- Auto-refresh scan at %Y-%m-%d %H:%M:%S ---\n")
                 # Use normal (non-verbose) mode for auto-refresh to keep output manageable
-                self.scan_normal()
+                self._start_scan(False, banner)
             else:
                 # Skip this cycle if a scan is already running
                 self.statusBar.showMessage("Auto-refresh: waiting for current scan to complete")